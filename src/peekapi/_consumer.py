@@ -5,7 +5,10 @@ import hashlib
 
 def hash_consumer_id(raw: str) -> str:
     """SHA-256 hash truncated to 12 hex chars, prefixed with 'hash_'."""
-    digest = hashlib.sha256(raw.encode()).hexdigest()[:12]
+    # Not cached: a cache would keep raw credentials alive in memory.  An
+    # identifier, not a security boundary; hex only the 6 bytes we keep.  Stays SHA-256 so the IDs
+    # match the other PeekAPI SDKs and the consumers already stored server-side.
+    digest = hashlib.sha256(raw.encode(), usedforsecurity=False).digest()[:6].hex()
     return f"hash_{digest}"
 
 
@@ -16,12 +19,18 @@ def default_identify_consumer(headers: dict[str, str]) -> str | None:
       1. x-api-key (stored as-is)
       2. Authorization (hashed — contains credentials)
     """
-    api_key = headers.get("x-api-key")
+    return consumer_from_credentials(headers.get("x-api-key"), headers.get("authorization"))
+
+
+def consumer_from_credentials(api_key: str | None, authorization: str | None) -> str | None:
+    """Default identification from the two header values it reads.
+
+    Lets middlewares look the headers up directly instead of building a dict.
+    """
     if api_key:
         return api_key
 
-    auth = headers.get("authorization")
-    if auth:
-        return hash_consumer_id(auth)
+    if authorization:
+        return hash_consumer_id(authorization)
 
     return None
@@ -0,0 +1,34 @@
+"""JSON encoding — uses orjson when it is installed, stdlib json otherwise."""
+
+from __future__ import annotations
+
+import json
+from typing import Any
+
+
+def _stdlib_dumps(obj: Any) -> bytes:
+    """Compact JSON as UTF-8 bytes."""
+    # ensure_ascii (the default) keeps the output pure ASCII, so encoding is
+    # a straight copy and len(bytes) == len(str) for size checks.
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+
+try:
+    import orjson
+except ImportError:
+    dumps = _stdlib_dumps
+    loads = json.loads
+else:
+
+    def dumps(obj: Any) -> bytes:
+        """Compact JSON as UTF-8 bytes; accepts whatever stdlib json accepts."""
+        try:
+            # Non-str keys are stringified, as stdlib json does
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            # orjson refuses integers past 64 bits; the event is still valid JSON
+            return _stdlib_dumps(obj)
+
+    loads = orjson.loads
+
+__all__ = ["dumps", "loads"]
@@ -1,47 +1,108 @@
 from __future__ import annotations
 
+import functools
 import ipaddress
-import re
-from urllib.parse import urlparse
-
-# Matches private/reserved IPv4 ranges (fast path)
-_PRIVATE_IP_RE = re.compile(
-    r"^(?:"
-    r"10\.\d{1,3}\.\d{1,3}\.\d{1,3}"
-    r"|172\.(?:1[6-9]|2\d|3[01])\.\d{1,3}\.\d{1,3}"
-    r"|192\.168\.\d{1,3}\.\d{1,3}"
-    r"|0\.0\.0\.0"
-    r")$"
+import socket
+from urllib.parse import urlsplit
+
+# Private/reserved IPv4 blocks as (network, netmask) integers: the blocks
+# ipaddress reports as private, loopback or link-local, plus CGNAT (100.64/10)
+# which is_private misses on some Python versions
+_PRIVATE_V4 = tuple(
+    (int(net.network_address), int(net.netmask))
+    for net in map(
+        ipaddress.IPv4Network,
+        (
+            "0.0.0.0/8",
+            "10.0.0.0/8",
+            "100.64.0.0/10",
+            "127.0.0.0/8",
+            "169.254.0.0/16",
+            "172.16.0.0/12",
+            "192.0.0.0/24",
+            "192.0.2.0/24",
+            "192.168.0.0/16",
+            "198.18.0.0/15",
+            "198.51.100.0/24",
+            "203.0.113.0/24",
+            "240.0.0.0/4",  # Includes 255.255.255.255
+        ),
+    )
 )
 
-# CGNAT range not covered by ipaddress.is_private in all Python versions
-_CGNAT_NETWORK = ipaddress.IPv4Network("100.64.0.0/10")
+# Same for IPv6: ULA, link-local, loopback, unspecified and the documentation
+# and IETF blocks.  IPv4-mapped addresses are checked against _PRIVATE_V4.
+_PRIVATE_V6 = tuple(
+    (int(net.network_address), int(net.netmask))
+    for net in map(
+        ipaddress.IPv6Network,
+        (
+            "::/128",
+            "::1/128",
+            "64:ff9b:1::/48",
+            "100::/64",
+            "2001::/23",
+            "2001:db8::/32",
+            "fc00::/7",
+            "fe80::/10",
+        ),
+    )
+)
+_V4_MAPPED_PREFIX = 0xFFFF  # ::ffff:0:0/96, shifted down by 32 bits
+
+
+# Hosts allowed over plain HTTP.  Exact matches only: a prefix test would let
+# "localhost.evil.com" or "127.0.0.1.nip.io" through.
+_LOCALHOSTS = frozenset({"localhost", "127.0.0.1", "::1"})
+
+# Last endpoint object that passed validation (identity check, no hashing)
+_last_valid: str | None = None
+
+
+def _parse_ipv4(host: str) -> int | None:
+    """IPv4 literal as a 32-bit integer, or None if *host* is not one.
+
+    Parsed with ``inet_aton`` — the rules the resolver applies to numeric
+    hosts — so octal (``0177.0.0.1``), hex (``0x7f.0.0.1``) and short forms
+    (``127.1``, ``2130706433``) map to the address a connection would reach.
+    """
+    try:
+        return int.from_bytes(socket.inet_aton(host), "big")
+    except (OSError, ValueError):  # ValueError: embedded NUL / non-ASCII
+        return None
+
+
+def _is_private_ipv4(value: int) -> bool:
+    return any(value & mask == net for net, mask in _PRIVATE_V4)
 
 
 def is_private_ip(host: str) -> bool:
     """Check if a hostname/IP is a private or reserved address.
 
-    Covers: RFC 1918, CGNAT (100.64/10), loopback, link-local,
-    IPv6 ULA/link-local, IPv4-mapped IPv6.
+    Covers: RFC 1918, CGNAT (100.64/10), loopback, link-local, reserved
+    IPv4 blocks, IPv6 ULA/link-local, IPv4-mapped IPv6.
     """
-    # Fast path regex
-    if _PRIVATE_IP_RE.match(host):
-        return True
+    # IPv4 literals, in every spelling inet_aton accepts, never reach ipaddress
+    # Dotted IPv4-mapped IPv6 takes the same path; other spellings (hex tail,
+    # mixed case, expanded zeros) fall through to ipaddress below
+    value = _parse_ipv4(host[7:] if host.startswith(("::ffff:", "::FFFF:")) else host)
+    if value is not None:
+        return _is_private_ipv4(value)
+    if ":" not in host:
+        return False  # A hostname: not IPv4 (checked above) and not IPv6
 
     try:
         addr = ipaddress.ip_address(host)
     except ValueError:
         return False
 
-    if isinstance(addr, ipaddress.IPv6Address):
-        # Check IPv4-mapped IPv6 (::ffff:x.x.x.x)
-        mapped = addr.ipv4_mapped
-        if mapped is not None:
-            return mapped.is_private or mapped.is_loopback or mapped.is_link_local
-        return addr.is_private or addr.is_loopback or addr.is_link_local
-
-    # IPv4 — is_private covers RFC 1918 + loopback + link-local; add CGNAT explicitly
-    return addr.is_private or addr.is_loopback or addr.is_link_local or addr in _CGNAT_NETWORK
+    value = int(addr)
+    if addr.version == 4:
+        return _is_private_ipv4(value)
+    if value >> 32 == _V4_MAPPED_PREFIX:
+        # IPv4-mapped IPv6 (::ffff:x.x.x.x)
+        return _is_private_ipv4(value & 0xFFFFFFFF)
+    return any(value & mask == net for net, mask in _PRIVATE_V6)
 
 
 def validate_endpoint(endpoint: str) -> str:
@@ -53,28 +114,46 @@ def validate_endpoint(endpoint: str) -> str:
       - Embedded credentials in URL
       - Malformed URLs
     """
+    global _last_valid
     if not endpoint:
         raise ValueError("endpoint is required")
+    # Deployments pass the same configured string to every client
+    if endpoint is _last_valid:
+        return endpoint
+
+    error = _endpoint_error(endpoint)
+    if error:
+        raise ValueError(error)
+    _last_valid = endpoint
+    return endpoint
 
-    parsed = urlparse(endpoint)
+
+@functools.lru_cache(maxsize=256)
+def _endpoint_error(endpoint: str) -> str | None:
+    """Why *endpoint* is rejected, or None.
+
+    Purely syntactic (no DNS), so the answer for a given string never changes
+    and processes that build many clients validate each endpoint once.
+    """
+    parsed = urlsplit(endpoint)
 
     if not parsed.scheme or not parsed.hostname:
-        raise ValueError(f"Invalid endpoint URL: {endpoint}")
+        return f"Invalid endpoint URL: {endpoint}"
 
     hostname = parsed.hostname.lower()
 
     # Allow HTTP only for localhost
-    is_localhost = hostname in ("localhost", "127.0.0.1", "::1")
+    is_localhost = hostname in _LOCALHOSTS
 
     if parsed.scheme != "https" and not is_localhost:
-        raise ValueError(f"HTTPS required for non-localhost endpoint: {endpoint}")
+        return f"HTTPS required for non-localhost endpoint: {endpoint}"
 
     # Reject embedded credentials
     if parsed.username or parsed.password:
-        raise ValueError("Endpoint URL must not contain credentials")
+        return "Endpoint URL must not contain credentials"
 
     # SSRF check — skip for localhost
     if not is_localhost and is_private_ip(hostname):
-        raise ValueError(f"Endpoint resolves to private/reserved IP: {hostname}")
+        return f"Endpoint resolves to private/reserved IP: {hostname}"
 
-    return endpoint
+    return None
@@ -1,23 +1,31 @@
 from __future__ import annotations
 
 import atexit
+import base64
+import collections
 import contextlib
+import errno
+import functools
 import hashlib
-import json
+import http.client
 import logging
+import mmap
 import os
 import random
-import re
+import selectors
 import signal
+import socket
+import ssl
 import tempfile
 import threading
 import time
-import urllib.error
 import urllib.request
-from dataclasses import asdict
-from datetime import datetime, timezone
+from dataclasses import fields
 from typing import Any
+from urllib.parse import unquote, urlparse
 
+from ._json import dumps as json_dumps
+from ._json import loads as json_loads
 from ._ssrf import validate_endpoint
 from ._version import __version__ as SDK_VERSION
 from .types import Options, RequestEvent
@@ -40,7 +48,127 @@ SEND_TIMEOUT_S = 5
 DISK_RECOVERY_INTERVAL_S = 60
 RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
 
-_CONTROL_CHAR_RE = re.compile(r"[\x00-\x1f\x7f]")
+# Value of the x-peekapi-sdk header; the ingest side parses "python/<version>"
+_SDK_HEADER = f"python/{SDK_VERSION}"
+
+_CONTROL_CHARS = frozenset(map(chr, [*range(0x20), 0x7F]))
+# Canonical spelling of the common methods, keyed by upper and lower case
+_KNOWN_METHODS = {
+    m: m.upper()
+    for name in ("GET", "POST", "PUT", "PATCH", "DELETE", "HEAD", "OPTIONS")
+    for m in (name, name.lower())
+}
+_REQUEST_EVENT_FIELDS = tuple(f.name for f in fields(RequestEvent))
+
+
+_HAS_WRITEV = hasattr(os, "writev")
+_IOV_MAX = 1024  # IOV_MAX on Linux and macOS
+_IOV_STEP = _IOV_MAX - _IOV_MAX % 3  # Whole "[", body, "]\n" lines per writev
+_datasync = getattr(os, "fdatasync", os.fsync)  # fdatasync skips the metadata flush
+
+
+def _encode_batch(events: list[bytes], end: bytes = b"]") -> bytes:
+    """Join pre-encoded events into a JSON array without re-serializing."""
+    return b"".join((b"[", b",".join(events), end))
+
+
+@functools.cache
+def _ssl_context() -> ssl.SSLContext:
+    """TLS context shared by every connection; loading the CA store is the costly part."""
+    return ssl.create_default_context()
+
+
+def _proxy_for(scheme: str, host: str) -> tuple[str, int, dict[str, str]] | None:
+    """Proxy host, port and auth headers for *scheme*://*host*, or None.
+
+    Honours HTTPS_PROXY/HTTP_PROXY/NO_PROXY through the same urllib helpers
+    ``urlopen`` uses, so the SDK goes wherever the rest of the process does.
+    """
+    proxy = urllib.request.getproxies().get(scheme)
+    if not proxy or urllib.request.proxy_bypass(host):
+        return None
+    parsed = urlparse(proxy if "://" in proxy else f"http://{proxy}")
+    if not parsed.hostname:
+        return None
+    headers = {}
+    if parsed.username:
+        creds = f"{unquote(parsed.username)}:{unquote(parsed.password or '')}"
+        headers["Proxy-Authorization"] = "Basic " + base64.b64encode(creds.encode()).decode()
+    return parsed.hostname, parsed.port or 80, headers
+
+
+def _pin_to_first_cpu() -> None:
+    """Pin the calling thread to the first CPU it may run on (Linux only)."""
+    if not hasattr(os, "sched_setaffinity"):
+        return
+    with contextlib.suppress(OSError):
+        os.sched_setaffinity(0, {min(os.sched_getaffinity(0))})
+
+
+def _fsync_dir(path: str) -> None:
+    """Make a rename of ``path`` durable by syncing its directory (POSIX only)."""
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    try:
+        fd = os.open(os.path.dirname(path) or ".", os.O_RDONLY | os.O_DIRECTORY)
+    except OSError:
+        return
+    try:
+        with contextlib.suppress(OSError):
+            os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class _Waker:
+    """Event-like wakeup for the flush thread, backed by a socket pair.
+
+    The read end is a plain file descriptor, so the flush loop waits on it
+    through a selector and can later share it with other I/O.  The default
+    selector (epoll/kqueue where available) has no ``FD_SETSIZE`` ceiling, so
+    servers with over 1024 open sockets still get a working wakeup.  A socket
+    pair is used instead of ``os.pipe`` because ``select`` only accepts sockets
+    on Windows.
+
+    Repeated ``set()`` calls between two ``clear()`` calls write a single
+    byte, so producers past the batch threshold don't pay a syscall each.
+    """
+
+    __slots__ = ("_pending", "_r", "_selector", "_w")
+
+    def __init__(self) -> None:
+        self._r, self._w = socket.socketpair()
+        self._r.setblocking(False)
+        self._w.setblocking(False)
+        self._pending = False
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self._r, selectors.EVENT_READ)
+
+    def set(self) -> None:
+        if self._pending:
+            return
+        self._pending = True
+        # A full socket buffer already guarantees a pending wakeup
+        with contextlib.suppress(OSError):
+            self._w.send(b"x")
+
+    def wait(self, timeout: float | None = None) -> None:
+        self._selector.select(timeout)
+
+    def clear(self) -> None:
+        # Drain before resetting: a set() landing mid-drain would otherwise have
+        # its byte swallowed while _pending stays True, muting every later set().
+        # A set() that sees the stale True is still covered — the worker checks
+        # the buffer right after clear().
+        with contextlib.suppress(OSError):
+            while self._r.recv(4096):
+                pass
+        self._pending = False
+
+    def close(self) -> None:
+        self._selector.close()
+        self._r.close()
+        self._w.close()
 
 
 class _RetryableError(Exception):
@@ -70,12 +198,32 @@ class PeekApiClient:
         # --- Validate ---
         if not options.api_key:
             raise ValueError("api_key is required")
-        if _CONTROL_CHAR_RE.search(options.api_key):
+        if not _CONTROL_CHARS.isdisjoint(options.api_key):
             raise ValueError("api_key contains invalid control characters")
 
         endpoint = options.endpoint or DEFAULT_ENDPOINT
         self._endpoint = validate_endpoint(endpoint)
 
+        # Parsed once — the flush thread keeps a keep-alive connection to this target
+        parsed = urlparse(self._endpoint)
+        self._conn_https = parsed.scheme == "https"
+        self._conn_host = parsed.hostname or ""
+        # Always explicit: given a bare IPv6 host and no port, http.client
+        # splits the address at its last colon
+        self._conn_port = parsed.port or (443 if self._conn_https else 80)
+        self._conn_path = (parsed.path or "/") + (f"?{parsed.query}" if parsed.query else "")
+        self._conn: http.client.HTTPConnection | None = None
+        self._send_headers = {
+            "Content-Type": "application/json",
+            "x-api-key": options.api_key,
+            "x-peekapi-sdk": _SDK_HEADER,
+        }
+        self._proxy = _proxy_for(parsed.scheme, self._conn_host)
+        if self._proxy is not None and not self._conn_https:
+            # A plain-HTTP proxy is sent the absolute URL and forwards it itself
+            self._conn_path = f"http://{parsed.netloc}{self._conn_path}"
+            self._send_headers.update(self._proxy[2])
+
         # --- Apply defaults ---
         self._api_key = options.api_key
         self._flush_interval = options.flush_interval or DEFAULT_FLUSH_INTERVAL
@@ -87,6 +235,7 @@ class PeekApiClient:
         self._identify_consumer = options.identify_consumer
         self._on_error = options.on_error
         self.collect_query_string = options.collect_query_string
+        self._pin_worker = options.pin_worker
 
         # --- Storage path ---
         if options.storage_path:
@@ -96,22 +245,34 @@ class PeekApiClient:
             self._storage_path = os.path.join(tempfile.gettempdir(), f"peekapi-events-{h}.jsonl")
 
         self._recovery_path: str | None = None
+        self._storage_fd: int | None = None
+        self._storage_lock = threading.RLock()
+        self._persist_queue: collections.deque[bytes] = collections.deque()
 
         # --- Internal state ---
-        self._buffer: list[dict[str, Any]] = []
+        # deque append/popleft are atomic, so producers never take the lock;
+        # it only guards the flush bookkeeping below.
+        self._buffer: collections.deque[dict[str, Any]] = collections.deque(
+            maxlen=self._max_buffer_size
+        )
+        # Bounded free list of cleared event dicts; the deque drops extras
+        self._event_pool: collections.deque[dict[str, Any]] = collections.deque(
+            maxlen=self._batch_size * 4
+        )
         self._lock = threading.Lock()
         self._in_flight = False
         self._consecutive_failures = 0
-        self._backoff_until = 0.0
+        self._backoff_until_ns = 0  # time.monotonic_ns() deadline
         self._shutdown = False
         self._last_disk_recovery = time.monotonic()
+        self._ts_cache: tuple[int, str] = (-1, "")  # (epoch second, formatted prefix)
 
         # --- Load persisted events ---
         self._load_from_disk()
 
         # --- Background flush thread ---
         self._done = threading.Event()
-        self._wake = threading.Event()
+        self._wake = _Waker()
         self._thread = threading.Thread(target=self._run, daemon=True, name="peekapi-flush")
         self._thread.start()
 
@@ -167,16 +328,19 @@ class PeekApiClient:
         self._done.set()
         self._wake.set()
         self._thread.join(timeout=5.0)
+        if not self._thread.is_alive():
+            self._wake.close()
 
         # Final flush
         self.flush()
 
+        self._close_connection()
+
         # Persist remainder
-        with self._lock:
-            remaining = list(self._buffer)
-            self._buffer.clear()
+        _, remaining = self._encode_events(self._drain_all())
         if remaining:
             self._persist_to_disk(remaining)
+        self._close_storage()
 
     # ------------------------------------------------------------------
     # Track internals
@@ -186,39 +350,51 @@ class PeekApiClient:
         if self._shutdown:
             return
 
-        d = asdict(event) if isinstance(event, RequestEvent) else dict(event)
+        # Reuse a dict recycled by a successful flush when one is available
+        try:
+            d = self._event_pool.pop()
+        except IndexError:
+            d = {}
+        if isinstance(event, RequestEvent):
+            # Flat dataclass — a shallow field copy is enough (asdict deep-copies).
+            # Unset optional fields are left out rather than sent as null.
+            for name in _REQUEST_EVENT_FIELDS:
+                value = getattr(event, name)
+                if value is not None:
+                    d[name] = value
+        else:
+            d.update(event)
 
         # Sanitize
-        d["method"] = str(d.get("method", ""))[:MAX_METHOD_LENGTH].upper()
+        method = d.get("method", "")
+        known = _KNOWN_METHODS.get(method) if type(method) is str else None
+        d["method"] = known or str(method)[:MAX_METHOD_LENGTH].upper()
         d["path"] = str(d.get("path", ""))[:MAX_PATH_LENGTH]
         if d.get("consumer_id"):
             d["consumer_id"] = str(d["consumer_id"])[:MAX_CONSUMER_ID_LENGTH]
 
         # Timestamp
         if not d.get("timestamp"):
-            d["timestamp"] = datetime.now(timezone.utc).isoformat()
-
-        # Per-event size limit
-        raw = json.dumps(d, separators=(",", ":"))
-        if len(raw.encode()) > self._max_event_bytes:
-            d.pop("metadata", None)
-            raw = json.dumps(d, separators=(",", ":"))
-            if len(raw.encode()) > self._max_event_bytes:
-                if self._debug:
-                    logger.warning("peekapi: event too large, dropping (%d bytes)", len(raw))
-                return
+            d["timestamp"] = self._timestamp()
 
-        with self._lock:
-            if len(self._buffer) >= self._max_buffer_size:
-                # Buffer full — trigger flush instead of dropping
-                self._wake.set()
-                return
-            self._buffer.append(d)
-            size = len(self._buffer)
+        # Serialization and the size limit are applied on the flush thread.  When
+        # the buffer is full, the deque's maxlen evicts the oldest event.
+        buffer = self._buffer
+        buffer.append(d)
 
-        if size >= self._batch_size:
+        if len(buffer) >= self._batch_size:
             self._wake.set()
 
+    def _timestamp(self) -> str:
+        """Current UTC time as ISO 8601, formatting the date part once per second."""
+        sec, ns = divmod(time.time_ns(), 1_000_000_000)
+        # Swapped as one tuple so concurrent producers never see a torn cache
+        cached = self._ts_cache
+        if cached[0] != sec:
+            cached = (sec, time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(sec)))
+            self._ts_cache = cached
+        return f"{cached[1]}.{ns // 1000:06d}Z"
+
     # ------------------------------------------------------------------
     # Flush internals
     # ------------------------------------------------------------------
@@ -227,29 +403,75 @@ class PeekApiClient:
         with self._lock:
             if not self._buffer or self._in_flight:
                 return []
-            now = time.monotonic()
-            if now < self._backoff_until:
+            if time.monotonic_ns() < self._backoff_until_ns:
                 return []
-            batch = self._buffer[: self._batch_size]
-            self._buffer = self._buffer[self._batch_size :]
             self._in_flight = True
-        return batch
+        # Single consumer while _in_flight is held — popleft() is O(1)
+        popleft = self._buffer.popleft
+        return [popleft() for _ in range(min(self._batch_size, len(self._buffer)))]
+
+    def _drain_all(self) -> list[dict[str, Any]]:
+        remaining: list[dict[str, Any]] = []
+        with contextlib.suppress(IndexError):
+            while True:
+                remaining.append(self._buffer.popleft())
+        return remaining
+
+    def _encode_events(
+        self, events: list[dict[str, Any]]
+    ) -> tuple[list[dict[str, Any]], list[bytes]]:
+        """Serialize events, enforcing max_event_bytes.
+
+        Returns the events that were kept alongside their encoded bytes.
+        Oversized events lose their metadata first and are dropped if
+        still too large; unserializable events are dropped.
+        """
+        kept: list[dict[str, Any]] = []
+        encoded: list[bytes] = []
+        dumps = json_dumps
+        limit = self._max_event_bytes
+        for d in events:
+            try:
+                raw = dumps(d)
+                if len(raw) > limit:
+                    d.pop("metadata", None)
+                    raw = dumps(d)
+            except (TypeError, ValueError):  # orjson.JSONEncodeError is a TypeError
+                if self._debug:
+                    logger.exception("peekapi: event not serializable, dropping")
+                continue
+            if len(raw) > limit:
+                if self._debug:
+                    logger.warning("peekapi: event too large, dropping (%d bytes)", len(raw))
+                continue
+            kept.append(d)
+            encoded.append(raw)
+        return kept, encoded
 
     def _do_flush(self, batch: list[dict[str, Any]]) -> None:
+        batch, encoded = self._encode_events(batch)
+        if not encoded:
+            with self._lock:
+                self._in_flight = False
+            return
         try:
-            self._send(batch)
+            self._send(encoded)
             # Success
             with self._lock:
                 self._consecutive_failures = 0
-                self._backoff_until = 0.0
+                self._backoff_until_ns = 0
                 self._in_flight = False
             self._cleanup_recovery_file()
             if self._debug:
                 logger.debug("peekapi: flushed %d events", len(batch))
+            # Delivered dicts are referenced nowhere else — recycle them for track()
+            for d in batch:
+                d.clear()
+            self._event_pool.extend(batch)
         except _NonRetryableError as exc:
             with self._lock:
                 self._in_flight = False
-            self._persist_to_disk(batch)
+            self._persist_to_disk(encoded)
             self._call_on_error(exc)
             if self._debug:
                 logger.warning("peekapi: non-retryable error, persisted to disk: %s", exc)
@@ -257,136 +479,212 @@ class PeekApiClient:
             with self._lock:
                 self._consecutive_failures += 1
                 failures = self._consecutive_failures
+                give_up = failures >= MAX_CONSECUTIVE_FAILURES
 
-                if failures >= MAX_CONSECUTIVE_FAILURES:
+                if give_up:
                     self._consecutive_failures = 0
                     self._in_flight = False
-                    self._persist_to_disk(batch)
                 else:
                     # Re-insert events at the front
                     space = self._max_buffer_size - len(self._buffer)
-                    reinsert = batch[:space]
-                    self._buffer = reinsert + self._buffer
+                    self._buffer.extendleft(reversed(batch[:space]))
                     # Exponential backoff with jitter
                     delay = BASE_BACKOFF_S * (2 ** (failures - 1)) * random.uniform(0.5, 1.0)
-                    self._backoff_until = time.monotonic() + delay
+                    self._backoff_until_ns = time.monotonic_ns() + int(delay * 1e9)
                     self._in_flight = False
 
+            # The synced write happens outside the lock so it never stalls
+            # flush() or the next drain
+            if give_up:
+                self._persist_to_disk(encoded)
             self._call_on_error(exc)
             if self._debug:
                 logger.warning("peekapi: flush failed (attempt %d): %s", failures, exc)
 
-    def _send(self, events: list[dict[str, Any]]) -> None:
-        body = json.dumps(events, separators=(",", ":")).encode()
-        req = urllib.request.Request(
-            self._endpoint,
-            data=body,
-            headers={
-                "Content-Type": "application/json",
-                "x-api-key": self._api_key,
-                "x-peekapi-sdk": f"python/{SDK_VERSION}",
-            },
-            method="POST",
-        )
-        try:
-            with urllib.request.urlopen(req, timeout=SEND_TIMEOUT_S) as resp:
-                resp.read()  # drain body
-                if resp.status < 200 or resp.status >= 300:
-                    raise _NonRetryableError(f"HTTP {resp.status}")
-        except urllib.error.HTTPError as exc:
-            status = exc.code
-            snippet = ""
+    def _send(self, events: list[bytes]) -> None:
+        body = _encode_batch(events)
+        # One silent retry when a reused keep-alive socket was closed by the server
+        for attempt in range(2):
+            reused = self._conn is not None
+            conn = self._conn or self._connect()
+            try:
+                conn.request("POST", self._conn_path, body, self._send_headers)
+                resp = conn.getresponse()
+                data = resp.read()  # drain body so the socket can be reused
+                break
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError) as exc:
+                self._close_connection()
+                if reused and attempt == 0:
+                    continue
+                raise _RetryableError(f"Network error: {exc}") from exc
+            except (OSError, http.client.HTTPException) as exc:
+                self._close_connection()
+                raise _RetryableError(f"Network error: {exc}") from exc
+
+        status = resp.status
+        if 200 <= status < 300:
+            return
+        snippet = data[:1024].decode(errors="replace")
+        if status in RETRYABLE_STATUS_CODES:
+            raise _RetryableError(f"HTTP {status}: {snippet}")
+        raise _NonRetryableError(f"HTTP {status}: {snippet}")
+
+    def _connect(self) -> http.client.HTTPConnection:
+        proxy = self._proxy
+        host, port = (proxy[0], proxy[1]) if proxy else (self._conn_host, self._conn_port)
+        conn: http.client.HTTPConnection
+        if self._conn_https:
+            conn = http.client.HTTPSConnection(
+                host, port, timeout=SEND_TIMEOUT_S, context=_ssl_context()
+            )
+            if proxy:
+                # CONNECT through the proxy; TLS is still negotiated with the endpoint
+                conn.set_tunnel(self._conn_host, self._conn_port, proxy[2])
+        else:
+            conn = http.client.HTTPConnection(host, port, timeout=SEND_TIMEOUT_S)
+        self._conn = conn
+        return conn
+
+    def _close_connection(self) -> None:
+        conn, self._conn = self._conn, None
+        if conn is not None:
             with contextlib.suppress(Exception):
-                snippet = exc.read(1024).decode(errors="replace")
-            if status in RETRYABLE_STATUS_CODES:
-                raise _RetryableError(f"HTTP {status}: {snippet}") from exc
-            raise _NonRetryableError(f"HTTP {status}: {snippet}") from exc
-        except urllib.error.URLError as exc:
-            raise _RetryableError(f"Network error: {exc.reason}") from exc
+                conn.close()
 
     # ------------------------------------------------------------------
     # Background thread
     # ------------------------------------------------------------------
 
     def _run(self) -> None:
+        if self._pin_worker:
+            _pin_to_first_cpu()
         while not self._done.is_set():
             self._wake.wait(timeout=self._flush_interval)
             self._wake.clear()
             if self._done.is_set():
                 break
-            batch = self._drain_batch()
-            if batch:
-                self._do_flush(batch)
+            self._flush_ready()
             # Periodically recover persisted events from disk
             now = time.monotonic()
             if now - self._last_disk_recovery >= DISK_RECOVERY_INTERVAL_S:
                 self._last_disk_recovery = now
                 self._load_from_disk()
 
+    def _flush_ready(self) -> None:
+        """Flush the next batch, then every full batch queued behind it.
+
+        One wakeup drains a burst instead of sleeping between batches.
+        """
+        batch = self._drain_batch()
+        while batch:
+            self._do_flush(batch)
+            if self._done.is_set() or len(self._buffer) < self._batch_size:
+                break
+            batch = self._drain_batch()
+
     # ------------------------------------------------------------------
     # Disk persistence
     # ------------------------------------------------------------------
 
-    def _persist_to_disk(self, events: list[dict[str, Any]]) -> None:
+    def _persist_to_disk(self, events: list[bytes]) -> None:
         try:
-            path = self._storage_path
-            # Check file size
-            try:
-                size = os.path.getsize(path)
-            except OSError:
-                size = 0
-            if size >= self._max_storage_bytes:
-                if self._debug:
-                    logger.warning("peekapi: storage file full, dropping %d events", len(events))
-                return
-
-            line = json.dumps(events, separators=(",", ":")) + "\n"
-            fd = os.open(path, os.O_APPEND | os.O_CREAT | os.O_WRONLY, 0o600)
-            try:
-                os.write(fd, line.encode())
-            finally:
-                os.close(fd)
+            # Only the comma-joined events are built here; _write_lines adds
+            # the array brackets and newline as separate iovecs
+            self._persist_queue.append(b",".join(events))
+            # Group commit: whoever holds the lock writes every queued line with
+            # one writev + fdatasync, so callers queued behind it usually find
+            # their line already on disk
+            with self._storage_lock:
+                queue = self._persist_queue
+                bodies = []
+                with contextlib.suppress(IndexError):
+                    while True:
+                        bodies.append(queue.popleft())
+                if bodies:
+                    self._write_lines(bodies)
         except Exception:
             if self._debug:
                 logger.exception("peekapi: disk persist failed")
 
+    def _write_lines(self, bodies: list[bytes]) -> None:
+        """Append each body as one ``[...]`` JSONL line and sync once."""
+        for attempt in range(2):
+            fd = self._open_storage()
+            try:
+                st = os.fstat(fd)
+                if st.st_nlink == 0:
+                    # File was unlinked underneath us — reopen at the path
+                    self._close_storage()
+                    continue
+                if st.st_size >= self._max_storage_bytes:
+                    if self._debug:
+                        logger.warning(
+                            "peekapi: storage file full, dropping %d batches", len(bodies)
+                        )
+                    return
+                # O_APPEND makes each write land atomically at the end
+                if _HAS_WRITEV:
+                    iov = []
+                    for body in bodies:
+                        iov += (b"[", body, b"]\n")
+                    # Step is a multiple of 3 so no line straddles two writes
+                    for i in range(0, len(iov), _IOV_STEP):
+                        os.writev(fd, iov[i : i + _IOV_STEP])
+                else:
+                    os.write(fd, b"".join(_encode_batch([body], end=b"]\n") for body in bodies))
+                _datasync(fd)
+                return
+            except OSError as exc:
+                self._close_storage()
+                if exc.errno != errno.EBADF or attempt:
+                    raise
+
+    def _open_storage(self) -> int:
+        """Return the cached append-only fd for the storage file, opening it lazily."""
+        if self._storage_fd is None:
+            self._storage_fd = os.open(
+                self._storage_path,
+                os.O_APPEND | os.O_CREAT | os.O_WRONLY | getattr(os, "O_CLOEXEC", 0),
+                0o600,
+            )
+        return self._storage_fd
+
+    def _close_storage(self) -> None:
+        fd, self._storage_fd = self._storage_fd, None
+        if fd is not None:
+            with contextlib.suppress(OSError):
+                os.close(fd)
+
     def _load_from_disk(self) -> None:
         # Try recovery file first (crash-before-flush leftover)
         recovery = self._storage_path + ".recovering"
+        # Held across read + rename so a concurrent persist can't append to
+        # the file after it was read
+        with self._storage_lock:
+            self._load_from_disk_locked(recovery)
+
+    def _load_from_disk_locked(self, recovery: str) -> None:
         for path in (recovery, self._storage_path):
             if not os.path.isfile(path):
                 continue
             try:
-                with open(path, encoding="utf-8") as f:
-                    content = f.read()
-                events: list[dict[str, Any]] = []
-                for line in content.splitlines():
-                    line = line.strip()
-                    if not line:
-                        continue
-                    try:
-                        parsed = json.loads(line)
-                        if isinstance(parsed, list):
-                            events.extend(parsed)
-                        elif isinstance(parsed, dict):
-                            events.append(parsed)
-                    except json.JSONDecodeError:
-                        continue
-                    if len(events) >= self._max_buffer_size:
-                        break
-
+                space = self._max_buffer_size - len(self._buffer)
+                events = self._read_events(path, space)
                 if events:
-                    with self._lock:
-                        space = self._max_buffer_size - len(self._buffer)
-                        self._buffer.extend(events[:space])
+                    self._buffer.extend(events[:space])
                     if self._debug:
                         logger.debug("peekapi: loaded %d events from disk", len(events))
 
                 # Rename to .recovering so we don't double-load
                 if path == self._storage_path:
                     rpath = self._storage_path + ".recovering"
+                    # The cached append fd would follow the rename
+                    self._close_storage()
                     try:
                         os.rename(path, rpath)
+                        # Without this a crash can bring the file back under
+                        # its old name and the events would load twice
+                        _fsync_dir(rpath)
                     except OSError:
                         with contextlib.suppress(OSError):
                             os.unlink(path)
@@ -398,6 +696,38 @@ class PeekApiClient:
                 if self._debug:
                     logger.exception("peekapi: disk load failed from %s", path)
 
+    def _read_events(self, path: str, limit: int) -> list[dict[str, Any]]:
+        """Parse up to ``limit`` events from a JSONL storage file via mmap.
+
+        Corrupt lines are skipped.  The file is mapped from a raw fd, so no
+        buffered file object or text decoding is involved.
+        """
+        events: list[dict[str, Any]] = []
+        fd = os.open(path, os.O_RDONLY | getattr(os, "O_CLOEXEC", 0))
+        try:
+            if limit <= 0 or os.fstat(fd).st_size == 0:
+                return events
+            with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mm:
+                start = 0
+                size = len(mm)
+                while start < size and len(events) < limit:
+                    end = mm.find(b"\n", start)
+                    if end == -1:
+                        end = size
+                    if end > start:
+                        try:
+                            parsed = json_loads(mm[start:end])
+                            if isinstance(parsed, list):
+                                events.extend(parsed)
+                            elif isinstance(parsed, dict):
+                                events.append(parsed)
+                        except ValueError:
+                            pass
+                    start = end + 1
+        finally:
+            os.close(fd)
+        return events
+
     def _cleanup_recovery_file(self) -> None:
         if self._recovery_path:
             with contextlib.suppress(OSError):
@@ -429,11 +759,10 @@ class PeekApiClient:
         self._done.set()
         self._wake.set()
 
-        with self._lock:
-            remaining = list(self._buffer)
-            self._buffer.clear()
+        _, remaining = self._encode_events(self._drain_all())
         if remaining:
             self._persist_to_disk(remaining)
+        self._close_storage()
 
     # ------------------------------------------------------------------
     # Helpers
@@ -0,0 +1,44 @@
+"""Helpers shared by the framework middlewares."""
+
+from __future__ import annotations
+
+import functools
+import time
+from typing import Any
+
+# HTTP_* environ key -> header name.  Header names repeat across requests,
+# so the translation is done once per distinct key.
+_HEADER_KEY_CACHE: dict[str, str] = {}
+_HEADER_KEY_CACHE_MAX = 512
+
+
+def _header_name(key: str) -> str:
+    name = key[5:].lower().replace("_", "-")
+    if len(_HEADER_KEY_CACHE) >= _HEADER_KEY_CACHE_MAX:
+        _HEADER_KEY_CACHE.clear()  # Bound memory against hostile header names
+    _HEADER_KEY_CACHE[key] = name
+    return name
+
+
+def extract_headers(environ: dict[str, Any]) -> dict[str, str]:
+    """Extract HTTP headers from a WSGI environ or Django META (HTTP_* keys)."""
+    cached = _HEADER_KEY_CACHE.get
+    return {
+        (cached(key) or _header_name(key)): value
+        for key, value in environ.items()
+        if key.startswith("HTTP_")
+    }
+
+
+def elapsed_ms(start_ns: int) -> float:
+    """Milliseconds since a ``time.perf_counter_ns()`` reading, truncated to 0.01."""
+    return (time.perf_counter_ns() - start_ns) // 10_000 / 100
+
+
+@functools.lru_cache(maxsize=1024)
+def sort_query_string(qs: str) -> str:
+    """Sort query parameters so equivalent URLs group together.
+
+    Hot endpoints repeat the same query strings, so results are cached.
+    """
+    return "&".join(sorted(qs.split("&")))
@@ -2,12 +2,33 @@
 
 from __future__ import annotations
 
-import contextlib
 import time
 from typing import Any
 
-from .._consumer import default_identify_consumer
+from .._consumer import consumer_from_credentials
 from ..client import PeekApiClient
+from ..types import RequestEvent
+from ._common import elapsed_ms, sort_query_string
+
+_WANTED_HEADERS = frozenset({b"x-api-key", b"authorization", b"content-length"})
+
+
+class _SendState:
+    """Wrapped ``send`` that records the response status and body size."""
+
+    __slots__ = ("send", "size", "status")
+
+    def __init__(self, send: Any) -> None:
+        self.send = send
+        self.status = 0
+        self.size = 0
+
+    async def __call__(self, message: dict) -> None:
+        if message["type"] == "http.response.start":
+            self.status = message.get("status", 0)
+        elif message["type"] == "http.response.body":
+            self.size += len(message.get("body", b""))
+        await self.send(message)
 
 
 class PeekApiASGI:
@@ -22,6 +43,8 @@ class PeekApiASGI:
         app.add_middleware(PeekApiASGI, client=client)
     """
 
+    __slots__ = ("app", "client")
+
     def __init__(self, app: Any, client: PeekApiClient | None = None, **kwargs: Any) -> None:
         self.app = app
         self.client = client
@@ -31,60 +54,61 @@ class PeekApiASGI:
             await self.app(scope, receive, send)
             return
 
-        start = time.perf_counter()
-        status_code = 0
-        response_size = 0
-
-        async def send_wrapper(message: dict) -> None:
-            nonlocal status_code, response_size
-            if message["type"] == "http.response.start":
-                status_code = message.get("status", 0)
-            elif message["type"] == "http.response.body":
-                body = message.get("body", b"")
-                response_size += len(body)
-            await send(message)
+        start = time.perf_counter_ns()
+        state = _SendState(send)
 
         try:
-            await self.app(scope, receive, send_wrapper)
+            await self.app(scope, receive, state)
         finally:
             try:
-                elapsed_ms = (time.perf_counter() - start) * 1000
-
-                # Extract headers from ASGI scope (list of [name, value] byte tuples)
-                headers: dict[str, str] = {}
-                for name, value in scope.get("headers", []):
-                    headers[name.decode("latin-1").lower()] = value.decode("latin-1")
+                response_time_ms = elapsed_ms(start)
 
+                # ASGI headers are a list of [name, value] byte pairs with lowercased names
+                raw_headers = scope.get("headers", [])
                 if self.client.identify_consumer:
+                    headers = {
+                        name.decode("latin-1").lower(): value.decode("latin-1")
+                        for name, value in raw_headers
+                    }
                     consumer_id = self.client.identify_consumer(headers)
+                    cl = headers.get("content-length")
                 else:
-                    consumer_id = default_identify_consumer(headers)
+                    # Only pick out the headers the default identification reads
+                    picked: dict[bytes, bytes] = {}
+                    for name, value in raw_headers:
+                        if name in _WANTED_HEADERS:
+                            picked[name] = value
+                    api_key = picked.get(b"x-api-key")
+                    auth = picked.get(b"authorization")
+                    consumer_id = consumer_from_credentials(
+                        api_key.decode("latin-1") if api_key else None,
+                        auth.decode("latin-1") if auth else None,
+                    )
+                    cl = picked.get(b"content-length")
 
                 method = scope.get("method", "GET")
                 path = scope.get("path", "/")
                 if self.client.collect_query_string:
                     qs = scope.get("query_string", b"").decode("latin-1")
                     if qs:
-                        sorted_qs = "&".join(sorted(qs.split("&")))
-                        path = f"{path}?{sorted_qs}"
+                        path = f"{path}?{sort_query_string(qs)}"
 
-                # Request size from content-length header
-                request_size = 0
-                cl = headers.get("content-length")
-                if cl:
-                    with contextlib.suppress(ValueError, TypeError):
-                        request_size = int(cl)
+                # Request size from content-length header (int() accepts bytes)
+                try:
+                    request_size = int(cl) if cl else 0
+                except (ValueError, TypeError):
+                    request_size = 0
 
                 self.client.track(
-                    {
-                        "method": method,
-                        "path": path,
-                        "status_code": status_code,
-                        "response_time_ms": round(elapsed_ms, 2),
-                        "request_size": request_size,
-                        "response_size": response_size,
-                        "consumer_id": consumer_id,
-                    }
+                    RequestEvent(
+                        method=method,
+                        path=path,
+                        status_code=state.status,
+                        response_time_ms=response_time_ms,
+                        request_size=request_size,
+                        response_size=state.size,
+                        consumer_id=consumer_id,
+                    )
                 )
             except Exception:
                 pass  # Never crash the app
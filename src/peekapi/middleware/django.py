@@ -2,12 +2,13 @@
 
 from __future__ import annotations
 
-import contextlib
 import time
 from typing import Any
 
-from .._consumer import default_identify_consumer
+from .._consumer import consumer_from_credentials
 from ..client import PeekApiClient
+from ..types import RequestEvent
+from ._common import elapsed_ms, extract_headers, sort_query_string
 
 
 class PeekApiMiddleware:
@@ -27,75 +28,98 @@ class PeekApiMiddleware:
     """
 
     _client: PeekApiClient | None = None
+    _settings_loaded = False
 
     def __init__(self, get_response: Any) -> None:
         self.get_response = get_response
 
-        # Initialize client on first instantiation
-        if PeekApiMiddleware._client is None:
-            try:
-                from django.conf import settings  # type: ignore[import-untyped]
-
-                config = getattr(settings, "PEEKAPI", None)
-                if config and isinstance(config, dict):
-                    PeekApiMiddleware._client = PeekApiClient(config)
-            except Exception:
-                pass  # Django not available or bad config — passthrough
+        # Initialize client on first instantiation.  Settings are read once per
+        # process, not at import time — settings may not be configured yet then.
+        if not PeekApiMiddleware._settings_loaded:
+            PeekApiMiddleware._settings_loaded = True
+            if PeekApiMiddleware._client is None:
+                PeekApiMiddleware._client = _client_from_settings()
 
     def __call__(self, request: Any) -> Any:
-        if self._client is None:
+        client = self._client
+        if client is None:
             return self.get_response(request)
 
-        start = time.perf_counter()
+        start = time.perf_counter_ns()
 
         response = self.get_response(request)
 
         try:
-            elapsed_ms = (time.perf_counter() - start) * 1000
+            response_time_ms = elapsed_ms(start)
 
-            # Django request.META stores headers as HTTP_* keys
-            headers: dict[str, str] = {}
-            for key, value in request.META.items():
-                if key.startswith("HTTP_"):
-                    header_name = key[5:].lower().replace("_", "-")
-                    headers[header_name] = value
-
-            if self._client.identify_consumer:
-                consumer_id = self._client.identify_consumer(headers)
+            meta = request.META
+            meta_get = meta.get
+            if client.identify_consumer:
+                # Django request.META stores headers as HTTP_* keys
+                consumer_id = client.identify_consumer(extract_headers(meta))
             else:
-                consumer_id = default_identify_consumer(headers)
-
-            # Response size from content
-            response_size = 0
-            if hasattr(response, "content"):
-                response_size = len(response.content)
+                consumer_id = consumer_from_credentials(
+                    meta_get("HTTP_X_API_KEY"), meta_get("HTTP_AUTHORIZATION")
+                )
+
+            # Response size: the declared Content-Length, else the buffered body.
+            # Streaming bodies are never materialized just to be counted.
+            response_size = _declared_size(response)
+            if response_size is None:
+                if getattr(response, "streaming", False) or not hasattr(response, "content"):
+                    response_size = 0
+                else:
+                    response_size = len(response.content)
 
             # Request size
-            request_size = 0
-            cl = request.META.get("CONTENT_LENGTH")
-            if cl:
-                with contextlib.suppress(ValueError, TypeError):
-                    request_size = int(cl)
+            cl = meta_get("CONTENT_LENGTH")
+            try:
+                request_size = int(cl) if cl else 0
+            except (ValueError, TypeError):
+                request_size = 0
 
             path = request.path
-            if self._client.collect_query_string:
-                qs = request.META.get("QUERY_STRING", "")
+            if client.collect_query_string:
+                qs = meta_get("QUERY_STRING", "")
                 if qs:
-                    sorted_qs = "&".join(sorted(qs.split("&")))
-                    path = f"{path}?{sorted_qs}"
-
-            self._client.track(
-                {
-                    "method": request.method,
-                    "path": path,
-                    "status_code": response.status_code,
-                    "response_time_ms": round(elapsed_ms, 2),
-                    "request_size": request_size,
-                    "response_size": response_size,
-                    "consumer_id": consumer_id,
-                }
+                    path = f"{path}?{sort_query_string(qs)}"
+
+            client.track(
+                RequestEvent(
+                    method=request.method,
+                    path=path,
+                    status_code=response.status_code,
+                    response_time_ms=response_time_ms,
+                    request_size=request_size,
+                    response_size=response_size,
+                    consumer_id=consumer_id,
+                )
             )
         except Exception:
             pass  # Never crash the app
 
         return response
+
+
+def _declared_size(response: Any) -> int | None:
+    """Valid Content-Length of the response, or None when absent or malformed."""
+    declared = response.get("Content-Length") if hasattr(response, "get") else None
+    if declared is None:
+        return None
+    try:
+        size = int(declared)
+    except (ValueError, TypeError):
+        return None
+    return size if size >= 0 else None
+
+
+def _client_from_settings() -> PeekApiClient | None:
+    try:
+        from django.conf import settings  # type: ignore[import-untyped]
+
+        config = getattr(settings, "PEEKAPI", None)
+        if config and isinstance(config, dict):
+            return PeekApiClient(config)
+    except Exception:
+        pass  # Django not available or bad config — passthrough
+    return None
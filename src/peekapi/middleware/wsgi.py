@@ -2,12 +2,13 @@
 
 from __future__ import annotations
 
-import contextlib
 import time
 from typing import Any
 
-from .._consumer import default_identify_consumer
+from .._consumer import consumer_from_credentials
 from ..client import PeekApiClient
+from ..types import RequestEvent
+from ._common import elapsed_ms, extract_headers, sort_query_string
 
 
 class PeekApiWSGI:
@@ -30,47 +31,42 @@ class PeekApiWSGI:
         if self.client is None:
             return self.app(environ, start_response)
 
-        start = time.perf_counter()
+        start = time.perf_counter_ns()
         status_code = 0
+        known_size: int | None = None
 
         def tracking_start_response(status: str, headers: list, exc_info: Any = None) -> Any:
-            nonlocal status_code
-            with contextlib.suppress(ValueError, IndexError, AttributeError):
-                status_code = int(status.split(" ", 1)[0])
+            nonlocal status_code, known_size
+            # An exc_info call replaces the headers — forget the old length
+            known_size = None
+            # WSGI status lines always start with the three-digit code
+            try:
+                status_code = int(status[:3])
+            except (ValueError, TypeError):
+                status_code = 0
+            for name, value in headers:
+                if name.lower() == "content-length":
+                    try:
+                        known_size = int(value)
+                    except (ValueError, TypeError):
+                        known_size = None
+                    break
             return start_response(status, headers, exc_info)
 
         try:
             response = self.app(environ, tracking_start_response)
+            if environ.get("REQUEST_METHOD") != "HEAD":
+                if known_size is None and type(response) in (list, tuple):
+                    # Materialized body — size it in C instead of per chunk
+                    known_size = sum(map(len, response))
+                if known_size is not None:
+                    # Size already known — skip the per-chunk wrapper
+                    return _ClosingResponse(response, self, environ, start, status_code, known_size)
             # Wrap the response iterator to measure size
             return _ResponseWrapper(response, self, environ, start, status_code)
         except Exception:
             # If the app raises, still try to track
-            try:
-                elapsed_ms = (time.perf_counter() - start) * 1000
-                headers = _extract_headers(environ)
-                if self.client.identify_consumer:
-                    consumer_id = self.client.identify_consumer(headers)
-                else:
-                    consumer_id = default_identify_consumer(headers)
-                path = environ.get("PATH_INFO", "/")
-                if self.client.collect_query_string:
-                    qs = environ.get("QUERY_STRING", "")
-                    if qs:
-                        sorted_qs = "&".join(sorted(qs.split("&")))
-                        path = f"{path}?{sorted_qs}"
-                self.client.track(
-                    {
-                        "method": environ.get("REQUEST_METHOD", "GET"),
-                        "path": path,
-                        "status_code": 500,
-                        "response_time_ms": round(elapsed_ms, 2),
-                        "request_size": _get_content_length(environ),
-                        "response_size": 0,
-                        "consumer_id": consumer_id,
-                    }
-                )
-            except Exception:
-                pass
+            _track_request(self.client, environ, start, 500, 0)
             raise
 
 
@@ -82,7 +78,7 @@ class _ResponseWrapper:
         response: Any,
         middleware: PeekApiWSGI,
         environ: dict,
-        start: float,
+        start: int,
         status_code: int,
     ) -> None:
         self._response = response
@@ -91,68 +87,127 @@ class _ResponseWrapper:
         self._start = start
         self._status_code = status_code
         self._size = 0
+        self._iterator: Any = None
+        self._finished = False
 
     def __iter__(self) -> Any:
+        self._iterator = self._stream()
+        return self._iterator
+
+    def _stream(self) -> Any:
+        # Accumulate in a local; written back once before tracking
+        size = 0
         try:
             for chunk in self._response:
-                self._size += len(chunk)
+                size += len(chunk)
                 yield chunk
         finally:
+            self._size = size
             self._finish()
 
     def _finish(self) -> None:
+        if self._finished:
+            return
+        self._finished = True
         try:
             if hasattr(self._response, "close"):
                 self._response.close()
         except Exception:
             pass
+        client = self._middleware.client
+        if client is not None:
+            _track_request(client, self._environ, self._start, self._status_code, self._size)
+
+    def close(self) -> None:
+        # Called by the WSGI server, possibly before the body was fully read:
+        # closing the generator runs its finally block; if iteration never
+        # started, finish directly so the app's close() and tracking still run
+        if self._iterator is not None:
+            self._iterator.close()
+        self._finish()
+
+
+class _ClosingResponse:
+    """Hands the app's iterator straight to the server; tracks when it is closed.
+
+    Used when the size is already known (declared Content-Length or a list
+    body), so there is nothing to count.
+    WSGI servers must call ``close()`` on the returned iterable.
+    """
+
+    def __init__(
+        self,
+        response: Any,
+        middleware: PeekApiWSGI,
+        environ: dict,
+        start: int,
+        status_code: int,
+        size: int,
+    ) -> None:
+        self._response = response
+        self._middleware = middleware
+        self._environ = environ
+        self._start = start
+        self._status_code = status_code
+        self._size = size
+        self._closed = False
+
+    def __iter__(self) -> Any:
+        return iter(self._response)
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
         try:
+            if hasattr(self._response, "close"):
+                self._response.close()
+        finally:
             client = self._middleware.client
-            if client is None:
-                return
-            elapsed_ms = (time.perf_counter() - self._start) * 1000
-            headers = _extract_headers(self._environ)
-            if client.identify_consumer:
-                consumer_id = client.identify_consumer(headers)
-            else:
-                consumer_id = default_identify_consumer(headers)
-            path = self._environ.get("PATH_INFO", "/")
-            if client.collect_query_string:
-                qs = self._environ.get("QUERY_STRING", "")
-                if qs:
-                    sorted_qs = "&".join(sorted(qs.split("&")))
-                    path = f"{path}?{sorted_qs}"
-            client.track(
-                {
-                    "method": self._environ.get("REQUEST_METHOD", "GET"),
-                    "path": path,
-                    "status_code": self._status_code,
-                    "response_time_ms": round(elapsed_ms, 2),
-                    "request_size": _get_content_length(self._environ),
-                    "response_size": self._size,
-                    "consumer_id": consumer_id,
-                }
-            )
-        except Exception:
-            pass  # Never crash the app
+            if client is not None:
+                _track_request(client, self._environ, self._start, self._status_code, self._size)
 
-    def close(self) -> None:
-        # Called explicitly by the WSGI server
-        pass
+
+def _track_request(
+    client: PeekApiClient, environ: dict, start: int, status_code: int, response_size: int
+) -> None:
+    """Track one finished request — shared by the normal and error paths."""
+    try:
+        response_time_ms = elapsed_ms(start)
+        env_get = environ.get
+        consumer_id = _identify(client, environ)
+        path = env_get("PATH_INFO", "/")
+        if client.collect_query_string:
+            qs = env_get("QUERY_STRING", "")
+            if qs:
+                path = f"{path}?{sort_query_string(qs)}"
+        client.track(
+            RequestEvent(
+                method=env_get("REQUEST_METHOD", "GET"),
+                path=path,
+                status_code=status_code,
+                response_time_ms=response_time_ms,
+                request_size=_get_content_length(environ),
+                response_size=response_size,
+                consumer_id=consumer_id,
+            )
+        )
+    except Exception:
+        pass  # Never crash the app
 
 
-def _extract_headers(environ: dict) -> dict[str, str]:
-    """Extract HTTP headers from WSGI environ (HTTP_* keys)."""
-    headers: dict[str, str] = {}
-    for key, value in environ.items():
-        if key.startswith("HTTP_"):
-            header_name = key[5:].lower().replace("_", "-")
-            headers[header_name] = value
-    return headers
+def _identify(client: PeekApiClient, environ: dict) -> str | None:
+    """Run the custom callback on all headers, or read the two default ones directly."""
+    if client.identify_consumer:
+        return client.identify_consumer(extract_headers(environ))
+    return consumer_from_credentials(
+        environ.get("HTTP_X_API_KEY"), environ.get("HTTP_AUTHORIZATION")
+    )
 
 
 def _get_content_length(environ: dict) -> int:
+    cl = environ.get("CONTENT_LENGTH")
     try:
-        return int(environ.get("CONTENT_LENGTH", 0) or 0)
+        return int(cl) if cl else 0
     except (ValueError, TypeError):
         return 0
@@ -5,7 +5,7 @@ from dataclasses import dataclass, field
 from typing import Any
 
 
-@dataclass
+@dataclass(slots=True)
 class RequestEvent:
     method: str
     path: str
@@ -34,3 +34,5 @@ class Options:
     # NOTE: increases DB usage — each unique path+query creates a separate endpoint row.
     collect_query_string: bool = False
     metadata: dict[str, Any] = field(default_factory=dict)
+    # Linux only: pins the flush thread to one CPU, which it then shares with the app.
+    pin_worker: bool = False
@@ -1,16 +1,20 @@
 from __future__ import annotations
 
 import contextlib
-import json
-import os
+import functools
 import signal
+import socketserver
 import threading
-from http.server import BaseHTTPRequestHandler, HTTPServer
+from collections.abc import Callable, Iterator
+from http import HTTPStatus
+from pathlib import Path
 from typing import Any
 
 import pytest
 
 from peekapi import PeekApiClient
+from peekapi._json import dumps as json_dumps
+from peekapi._json import loads as json_loads
 
 
 @pytest.fixture
@@ -19,37 +23,67 @@ def tmp_storage_path(tmp_path: Any) -> str:
     return str(tmp_path / "peekapi-events.jsonl")
 
 
-class IngestHandler(BaseHTTPRequestHandler):
-    """Simple HTTP handler that records received payloads."""
-
-    server: IngestServer  # type: ignore[assignment]
-
-    def do_POST(self) -> None:
-        length = int(self.headers.get("Content-Length", 0))
-        body = self.rfile.read(length)
-        events = json.loads(body)
-        api_key = self.headers.get("x-api-key", "")
-        sdk_header = self.headers.get("x-peekapi-sdk", "")
-        self.server.payloads.append({"events": events, "api_key": api_key, "sdk": sdk_header})  # type: ignore[attr-defined]
-
-        status = self.server.response_status  # type: ignore[attr-defined]
-        self.send_response(status)
-        self.send_header("Content-Type", "application/json")
-        self.end_headers()
-        self.wfile.write(json.dumps({"accepted": len(events)}).encode())
-
-    def log_message(self, *args: Any) -> None:
-        pass  # Suppress request logging
-
-
-class IngestServer(HTTPServer):
+@functools.cache
+def _canned_response(status: int, accepted: int) -> bytes:
+    """Full HTTP response for a status/accepted-count pair, built once."""
+    reply = json_dumps({"accepted": accepted})
+    head = (
+        f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(reply)}\r\n\r\n"
+    )
+    return head.encode() + reply
+
+
+class IngestHandler(socketserver.BaseRequestHandler):
+    """Minimal keep-alive HTTP responder that records received payloads.
+
+    Only understands what the client sends — a request line, headers and a
+    Content-Length body — and answers each request with a single ``sendall``.
+    """
+
+    server: IngestServer
+
+    def handle(self) -> None:
+        sock = self.request
+        buf = b""
+        while True:
+            while b"\r\n\r\n" not in buf:
+                chunk = sock.recv(65536)
+                if not chunk:
+                    return
+                buf += chunk
+            head, _, buf = buf.partition(b"\r\n\r\n")
+            headers: dict[bytes, str] = {}
+            for line in head.split(b"\r\n")[1:]:
+                name, _, value = line.partition(b":")
+                headers[name.strip().lower()] = value.strip().decode("latin-1")
+
+            length = int(headers.get(b"content-length", 0))
+            while len(buf) < length:
+                chunk = sock.recv(65536)
+                if not chunk:
+                    return
+                buf += chunk
+            body, buf = buf[:length], buf[length:]
+
+            events = json_loads(body)
+            api_key = headers.get(b"x-api-key", "")
+            sdk_header = headers.get(b"x-peekapi-sdk", "")
+            self.server.payloads.append({"events": events, "api_key": api_key, "sdk": sdk_header})
+
+            sock.sendall(_canned_response(self.server.response_status, len(events)))
+
+
+class IngestServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
     payloads: list[dict[str, Any]]
     response_status: int
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def ingest_server():
-    """Start a local HTTP server in a thread, yield (url, payloads list)."""
+    """Start one local HTTP server for the session, yield (server, url)."""
     server = IngestServer(("127.0.0.1", 0), IngestHandler)
     server.payloads = []
     server.response_status = 200
@@ -62,13 +96,21 @@ def ingest_server():
     yield server, url
 
     server.shutdown()
+    server.server_close()
     thread.join(timeout=2)
 
 
-@pytest.fixture
-def make_client(ingest_server, tmp_storage_path):
-    """Factory that creates a client pre-configured for test server."""
-    server, url = ingest_server
+@pytest.fixture(autouse=True)
+def _reset_ingest(ingest_server):
+    """Give every test a clean view of the shared ingest server."""
+    server, _ = ingest_server
+    server.payloads.clear()
+    server.response_status = 200
+
+
+@contextlib.contextmanager
+def _client_factory(url: str, storage_path: str) -> Iterator[Callable[..., PeekApiClient]]:
+    """Yield a client factory; shut down every client it created afterwards."""
     clients: list[PeekApiClient] = []
 
     def _make(**overrides: Any) -> PeekApiClient:
@@ -77,7 +119,7 @@ def make_client(ingest_server, tmp_storage_path):
             "endpoint": url,
             "flush_interval": 60.0,  # Don't auto-flush in tests
             "batch_size": 100,
-            "storage_path": tmp_storage_path,
+            "storage_path": storage_path,
             "debug": True,
             **overrides,
         }
@@ -85,21 +127,64 @@ def make_client(ingest_server, tmp_storage_path):
         clients.append(c)
         return c
 
-    yield _make, server, url
+    yield _make
 
     for c in clients:
         # Restore signal handlers before shutdown to avoid test interference
-        for sig, handler in list(c._original_handlers.items()):
-            with contextlib.suppress(OSError, ValueError):
-                signal.signal(sig, handler)
-            c._original_handlers.clear()
+        orig = c._original_handlers
+        for sig, handler in orig.items():
+            if signal.getsignal(sig) is not handler:
+                with contextlib.suppress(OSError, ValueError):
+                    signal.signal(sig, handler)
+        orig.clear()
         c._shutdown = True
         c._done.set()
         c._wake.set()
         with contextlib.suppress(Exception):
             c._thread.join(timeout=2)
+        if not c._thread.is_alive():
+            c._wake.close()
 
     # Clean up storage
-    for path in (tmp_storage_path, tmp_storage_path + ".recovering"):
-        with contextlib.suppress(OSError):
-            os.unlink(path)
+    for path in (storage_path, storage_path + ".recovering"):
+        Path(path).unlink(missing_ok=True)
+
+
+@pytest.fixture
+def make_client(ingest_server, tmp_storage_path):
+    """Factory that creates a client pre-configured for test server."""
+    server, url = ingest_server
+    with _client_factory(url, tmp_storage_path) as _make:
+        yield _make, server, url
+
+
+class StubIngest:
+    """Records batches handed to ``_send`` — no socket involved."""
+
+    def __init__(self) -> None:
+        self.payloads: list[dict[str, Any]] = []
+
+
+@pytest.fixture
+def stub_ingest(monkeypatch, tmp_storage_path):
+    """Like make_client, but batches are captured in-process instead of over HTTP.
+
+    For tests that only inspect payloads; keep make_client for wire-level tests.
+    """
+    stub = StubIngest()
+
+    def _send(self: PeekApiClient, events: list[bytes]) -> None:
+        headers = self._send_headers
+        stub.payloads.append(
+            {
+                "events": [json_loads(e) for e in events],
+                "api_key": headers["x-api-key"],
+                "sdk": headers["x-peekapi-sdk"],
+            }
+        )
+
+    # Patched on the class so every client the factory builds picks it up
+    monkeypatch.setattr(PeekApiClient, "_send", _send)
+    url = "http://127.0.0.1:9"  # Never contacted
+    with _client_factory(url, tmp_storage_path) as _make:
+        yield _make, stub, url
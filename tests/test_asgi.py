@@ -6,6 +6,7 @@ from typing import Any
 
 import pytest
 
+from peekapi._consumer import hash_consumer_id
 from peekapi.middleware.asgi import PeekApiASGI
 
 # ── Helpers ──────────────────────────────────────────────────────────
@@ -65,8 +66,8 @@ async def collect_response(app: Any, scope: dict) -> list[dict]:
 
 class TestAsgiMiddleware:
     @pytest.mark.asyncio
-    async def test_captures_status_and_path(self, make_client):
-        _make, server, _ = make_client
+    async def test_captures_status_and_path(self, stub_ingest):
+        _make, ingest, _ = stub_ingest
         client = _make()
         app = PeekApiASGI(simple_asgi_app, client=client)
 
@@ -74,27 +75,27 @@ class TestAsgiMiddleware:
         await collect_response(app, scope)
         client.flush()
 
-        assert len(server.payloads) == 1
-        event = server.payloads[0]["events"][0]
+        assert len(ingest.payloads) == 1
+        event = ingest.payloads[0]["events"][0]
         assert event["method"] == "POST"
         assert event["path"] == "/users"
         assert event["status_code"] == 200
 
     @pytest.mark.asyncio
-    async def test_captures_response_size(self, make_client):
-        _make, server, _ = make_client
+    async def test_captures_response_size(self, stub_ingest):
+        _make, ingest, _ = stub_ingest
         client = _make()
         app = PeekApiASGI(simple_asgi_app, client=client)
 
         await collect_response(app, make_scope())
         client.flush()
 
-        event = server.payloads[0]["events"][0]
+        event = ingest.payloads[0]["events"][0]
         assert event["response_size"] == len(b"Hello, World!")
 
     @pytest.mark.asyncio
-    async def test_captures_consumer_from_headers(self, make_client):
-        _make, server, _ = make_client
+    async def test_captures_consumer_from_headers(self, stub_ingest):
+        _make, ingest, _ = stub_ingest
         client = _make()
         app = PeekApiASGI(simple_asgi_app, client=client)
 
@@ -102,9 +103,22 @@ class TestAsgiMiddleware:
         await collect_response(app, scope)
         client.flush()
 
-        event = server.payloads[0]["events"][0]
+        event = ingest.payloads[0]["events"][0]
         assert event["consumer_id"] == "client-key-123"
 
+    @pytest.mark.asyncio
+    async def test_authorization_header_hashed(self, stub_ingest):
+        _make, ingest, _ = stub_ingest
+        client = _make()
+        app = PeekApiASGI(simple_asgi_app, client=client)
+
+        scope = make_scope(headers=[(b"accept", b"*/*"), (b"authorization", b"Bearer tok")])
+        await collect_response(app, scope)
+        client.flush()
+
+        event = ingest.payloads[0]["events"][0]
+        assert event["consumer_id"] == hash_consumer_id("Bearer tok")
+
     @pytest.mark.asyncio
     async def test_nil_client_passthrough(self):
         app = PeekApiASGI(simple_asgi_app, client=None)
@@ -112,8 +126,8 @@ class TestAsgiMiddleware:
         assert any(m.get("status") == 200 for m in sent)
 
     @pytest.mark.asyncio
-    async def test_error_propagation(self, make_client):
-        _make, _, _ = make_client
+    async def test_error_propagation(self, stub_ingest):
+        _make, _, _ = stub_ingest
         client = _make()
         app = PeekApiASGI(error_asgi_app, client=client)
 
@@ -121,8 +135,8 @@ class TestAsgiMiddleware:
             await collect_response(app, make_scope())
 
     @pytest.mark.asyncio
-    async def test_non_http_scope_passthrough(self, make_client):
-        _make, _server, _ = make_client
+    async def test_non_http_scope_passthrough(self, stub_ingest):
+        _make, _ingest, _ = stub_ingest
         client = _make()
 
         called = False
@@ -138,20 +152,20 @@ class TestAsgiMiddleware:
         assert len(client._buffer) == 0
 
     @pytest.mark.asyncio
-    async def test_response_time_measured(self, make_client):
-        _make, server, _ = make_client
+    async def test_response_time_measured(self, stub_ingest):
+        _make, ingest, _ = stub_ingest
         client = _make()
         app = PeekApiASGI(simple_asgi_app, client=client)
 
         await collect_response(app, make_scope())
         client.flush()
 
-        event = server.payloads[0]["events"][0]
+        event = ingest.payloads[0]["events"][0]
         assert event["response_time_ms"] >= 0
 
     @pytest.mark.asyncio
-    async def test_custom_identify_consumer(self, make_client):
-        _make, server, _ = make_client
+    async def test_custom_identify_consumer(self, stub_ingest):
+        _make, ingest, _ = stub_ingest
         client = _make(identify_consumer=lambda headers: headers.get("x-tenant-id"))
         app = PeekApiASGI(simple_asgi_app, client=client)
 
@@ -159,12 +173,12 @@ class TestAsgiMiddleware:
         await collect_response(app, scope)
         client.flush()
 
-        event = server.payloads[0]["events"][0]
+        event = ingest.payloads[0]["events"][0]
         assert event["consumer_id"] == "tenant-42"
 
     @pytest.mark.asyncio
-    async def test_request_size_from_content_length(self, make_client):
-        _make, server, _ = make_client
+    async def test_request_size_from_content_length(self, stub_ingest):
+        _make, ingest, _ = stub_ingest
         client = _make()
         app = PeekApiASGI(simple_asgi_app, client=client)
 
@@ -172,12 +186,12 @@ class TestAsgiMiddleware:
         await collect_response(app, scope)
         client.flush()
 
-        event = server.payloads[0]["events"][0]
+        event = ingest.payloads[0]["events"][0]
         assert event["request_size"] == 42
 
     @pytest.mark.asyncio
-    async def test_collect_query_string_disabled_by_default(self, make_client):
-        _make, server, _ = make_client
+    async def test_collect_query_string_disabled_by_default(self, stub_ingest):
+        _make, ingest, _ = stub_ingest
         client = _make()
         app = PeekApiASGI(simple_asgi_app, client=client)
 
@@ -186,12 +200,12 @@ class TestAsgiMiddleware:
         await collect_response(app, scope)
         client.flush()
 
-        event = server.payloads[0]["events"][0]
+        event = ingest.payloads[0]["events"][0]
         assert event["path"] == "/search"
 
     @pytest.mark.asyncio
-    async def test_collect_query_string_enabled(self, make_client):
-        _make, server, _ = make_client
+    async def test_collect_query_string_enabled(self, stub_ingest):
+        _make, ingest, _ = stub_ingest
         client = _make(collect_query_string=True)
         app = PeekApiASGI(simple_asgi_app, client=client)
 
@@ -200,12 +214,12 @@ class TestAsgiMiddleware:
         await collect_response(app, scope)
         client.flush()
 
-        event = server.payloads[0]["events"][0]
+        event = ingest.payloads[0]["events"][0]
         assert event["path"] == "/search?a=1&z=3"
 
     @pytest.mark.asyncio
-    async def test_collect_query_string_sorts_params(self, make_client):
-        _make, server, _ = make_client
+    async def test_collect_query_string_sorts_params(self, stub_ingest):
+        _make, ingest, _ = stub_ingest
         client = _make(collect_query_string=True)
         app = PeekApiASGI(simple_asgi_app, client=client)
 
@@ -214,12 +228,12 @@ class TestAsgiMiddleware:
         await collect_response(app, scope)
         client.flush()
 
-        event = server.payloads[0]["events"][0]
+        event = ingest.payloads[0]["events"][0]
         assert event["path"] == "/users?name=alice&role=admin"
 
     @pytest.mark.asyncio
-    async def test_collect_query_string_no_qs(self, make_client):
-        _make, server, _ = make_client
+    async def test_collect_query_string_no_qs(self, stub_ingest):
+        _make, ingest, _ = stub_ingest
         client = _make(collect_query_string=True)
         app = PeekApiASGI(simple_asgi_app, client=client)
 
@@ -227,5 +241,5 @@ class TestAsgiMiddleware:
         await collect_response(app, scope)
         client.flush()
 
-        event = server.payloads[0]["events"][0]
+        event = ingest.payloads[0]["events"][0]
         assert event["path"] == "/users"
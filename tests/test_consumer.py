@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import hashlib
+
 from peekapi._consumer import default_identify_consumer, hash_consumer_id
 
 
@@ -21,6 +23,13 @@ class TestHashConsumerId:
         b = hash_consumer_id("Bearer xyz")
         assert a != b
 
+    def test_matches_sha256_prefix(self):
+        expected = hashlib.sha256(b"Bearer token123").hexdigest()[:12]
+        assert hash_consumer_id("Bearer token123") == f"hash_{expected}"
+
+    def test_raw_credentials_not_cached(self):
+        assert not hasattr(hash_consumer_id, "cache_info")
+
     def test_hex_output(self):
         result = hash_consumer_id("test")
         hex_part = result[5:]  # strip "hash_"
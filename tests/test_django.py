@@ -4,6 +4,8 @@ from __future__ import annotations
 
 from unittest.mock import MagicMock
 
+import pytest
+
 from peekapi.middleware.django import PeekApiMiddleware
 
 # ── Helpers ──────────────────────────────────────────────────────────
@@ -21,10 +23,17 @@ def make_django_request(
     return request
 
 
-def make_django_response(status_code: int = 200, content: bytes = b"OK") -> MagicMock:
+def make_django_response(
+    status_code: int = 200,
+    content: bytes = b"OK",
+    headers: dict[str, str] | None = None,
+    streaming: bool = False,
+) -> MagicMock:
     response = MagicMock()
     response.status_code = status_code
     response.content = content
+    response.streaming = streaming
+    response.get = (headers or {}).get
     return response
 
 
@@ -70,6 +79,43 @@ class TestDjangoMiddleware:
         event = server.payloads[0]["events"][0]
         assert event["response_size"] == len(body)
 
+    def test_response_size_from_content_length(self, make_client):
+        _make, server, _ = make_client
+        client = _make()
+        PeekApiMiddleware._client = client
+
+        response = make_django_response(headers={"Content-Length": "1234"})
+        middleware = PeekApiMiddleware(MagicMock(return_value=response))
+        middleware(make_django_request())
+        client.flush()
+
+        assert server.payloads[0]["events"][0]["response_size"] == 1234
+
+    def test_malformed_content_length_falls_back_to_body(self, make_client):
+        _make, server, _ = make_client
+        client = _make()
+        PeekApiMiddleware._client = client
+
+        response = make_django_response(content=b"12345", headers={"Content-Length": "abc"})
+        middleware = PeekApiMiddleware(MagicMock(return_value=response))
+        middleware(make_django_request())
+        client.flush()
+
+        assert server.payloads[0]["events"][0]["response_size"] == 5
+
+    def test_streaming_response_not_materialized(self, make_client):
+        _make, server, _ = make_client
+        client = _make()
+        PeekApiMiddleware._client = client
+
+        response = make_django_response(streaming=True)
+        type(response).content = property(lambda self: pytest.fail("content was read"))
+        middleware = PeekApiMiddleware(MagicMock(return_value=response))
+        middleware(make_django_request())
+        client.flush()
+
+        assert server.payloads[0]["events"][0]["response_size"] == 0
+
     def test_captures_consumer_from_headers(self, make_client):
         _make, server, _ = make_client
         client = _make()
@@ -101,6 +147,19 @@ class TestDjangoMiddleware:
         event = server.payloads[0]["events"][0]
         assert event["consumer_id"] == "tenant-42"
 
+    def test_custom_identify_consumer_gets_plain_dict(self, make_client):
+        _make, server, _ = make_client
+        seen = []
+        client = _make(identify_consumer=lambda headers: seen.append(headers.copy()) or "t")
+        PeekApiMiddleware._client = client
+
+        middleware = PeekApiMiddleware(MagicMock(return_value=make_django_response()))
+        middleware(make_django_request(meta={"HTTP_X_TENANT_ID": "tenant-42"}))
+        client.flush()
+
+        assert seen == [{"x-tenant-id": "tenant-42"}]
+        assert server.payloads[0]["events"][0]["consumer_id"] == "t"
+
     def test_nil_client_passthrough(self):
         PeekApiMiddleware._client = None
         response = make_django_response()
@@ -174,3 +233,14 @@ class TestDjangoMiddleware:
 
         event = server.payloads[0]["events"][0]
         assert event["path"] == "/users"
+
+    def test_settings_read_once(self, monkeypatch):
+        calls = []
+        monkeypatch.setattr(PeekApiMiddleware, "_settings_loaded", False)
+        monkeypatch.setattr(
+            "peekapi.middleware.django._client_from_settings", lambda: calls.append(1)
+        )
+
+        PeekApiMiddleware(MagicMock())
+        PeekApiMiddleware(MagicMock())
+        assert calls == [1]
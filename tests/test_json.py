@@ -0,0 +1,33 @@
+"""Tests for the JSON backend selection."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from peekapi import _json
+
+
+class TestOrjsonBackend:
+    @pytest.fixture(autouse=True)
+    def _require_orjson(self):
+        pytest.importorskip("orjson")
+
+    def test_orjson_selected(self):
+        assert _json.loads is __import__("orjson").loads
+
+    @pytest.mark.parametrize(
+        "obj",
+        [
+            {"metadata": {1: "a", None: "b"}},
+            {"metadata": {"n": 2**70}},
+            {"metadata": {"n": -(2**64)}},
+        ],
+    )
+    def test_accepts_what_stdlib_accepts(self, obj):
+        assert json.loads(_json.dumps(obj)) == json.loads(json.dumps(obj))
+
+    def test_unserializable_still_raises(self):
+        with pytest.raises(TypeError):
+            _json.dumps({"obj": object()})
@@ -2,11 +2,19 @@
 
 from __future__ import annotations
 
+import sys
+import time
 from io import BytesIO
 from typing import Any
 
 import pytest
 
+from peekapi import hash_consumer_id
+from peekapi.middleware._common import (
+    elapsed_ms,
+    extract_headers,
+    sort_query_string,
+)
 from peekapi.middleware.wsgi import PeekApiWSGI
 
 # ── Helpers ──────────────────────────────────────────────────────────
@@ -18,24 +26,33 @@ def simple_wsgi_app(environ: dict, start_response: Any) -> list[bytes]:
     return [b"Hello, World!"]
 
 
+def sized_wsgi_app(environ: dict, start_response: Any) -> list[bytes]:
+    """WSGI app that declares Content-Length."""
+    body = b"Hello, World!"
+    start_response("200 OK", [("Content-Type", "text/plain"), ("Content-Length", str(len(body)))])
+    return [body]
+
+
 def error_wsgi_app(environ: dict, start_response: Any) -> list[bytes]:
     """WSGI app that raises an exception."""
     raise RuntimeError("app error")
 
 
+# Keys every test environ shares; copied, never mutated
+_BASE_ENVIRON: dict[str, Any] = {"SERVER_NAME": "localhost", "SERVER_PORT": "8000"}
+
+
 def make_environ(
     method: str = "GET",
     path: str = "/api/test",
     headers: dict[str, str] | None = None,
     content_length: int = 0,
 ) -> dict:
-    env: dict[str, Any] = {
-        "REQUEST_METHOD": method,
-        "PATH_INFO": path,
-        "SERVER_NAME": "localhost",
-        "SERVER_PORT": "8000",
-        "wsgi.input": BytesIO(b""),
-    }
+    env = _BASE_ENVIRON.copy()
+    env["REQUEST_METHOD"] = method
+    env["PATH_INFO"] = path
+    # Streams are stateful — each environ gets its own
+    env["wsgi.input"] = BytesIO(b"")
     if content_length:
         env["CONTENT_LENGTH"] = str(content_length)
     if headers:
@@ -90,6 +107,113 @@ class TestWsgiMiddleware:
         event = server.payloads[0]["events"][0]
         assert event["response_size"] == len(b"Hello, World!")
 
+    def test_streams_chunks_without_buffering(self, stub_ingest):
+        _make, ingest, _ = stub_ingest
+        client = _make()
+        produced = []
+
+        def streaming_app(environ: dict, start_response: Any) -> Any:
+            start_response("200 OK", [("Content-Type", "text/plain")])
+            for chunk in (b"one", b"two", b"three"):
+                produced.append(chunk)
+                yield chunk
+
+        chunks = iter(PeekApiWSGI(streaming_app, client=client)(make_environ(), lambda *a: None))
+        assert next(chunks) == b"one"
+        assert produced == [b"one"]  # Pulled through one chunk at a time
+        assert list(chunks) == [b"two", b"three"]
+        client.flush()
+
+        assert ingest.payloads[0]["events"][0]["response_size"] == len(b"onetwothree")
+
+    def test_close_after_partial_read_tracks_and_closes_app(self, stub_ingest):
+        _make, ingest, _ = stub_ingest
+        client = _make()
+        closed = []
+
+        class Body:
+            def __iter__(self) -> Any:
+                return iter([b"abc", b"defg"])
+
+            def close(self) -> None:
+                closed.append(True)
+
+        def app(environ: dict, start_response: Any) -> Body:
+            start_response("200 OK", [])
+            return Body()
+
+        response = PeekApiWSGI(app, client=client)(make_environ(), lambda *a: None)
+        assert next(iter(response)) == b"abc"
+        response.close()  # Client disconnected mid-body
+        response.close()
+        client.flush()
+
+        assert closed == [True]
+        assert [e["response_size"] for e in ingest.payloads[0]["events"]] == [3]
+
+    def test_close_without_iteration_still_tracks(self, stub_ingest):
+        _make, ingest, _ = stub_ingest
+        client = _make()
+
+        def app(environ: dict, start_response: Any) -> Any:
+            start_response("200 OK", [])
+            return iter([b"never sent"])
+
+        PeekApiWSGI(app, client=client)(make_environ(), lambda *a: None).close()
+        client.flush()
+
+        assert [e["response_size"] for e in ingest.payloads[0]["events"]] == [0]
+
+    def test_declared_content_length_tracked_on_close(self, make_client):
+        _make, server, _ = make_client
+        client = _make()
+        app = PeekApiWSGI(sized_wsgi_app, client=client)
+
+        response = app(make_environ(), lambda status, headers, exc_info=None: None)
+        assert list(response) == [b"Hello, World!"]
+        assert len(client._buffer) == 0  # Not tracked until the server closes it
+        response.close()
+        client.flush()
+
+        event = server.payloads[0]["events"][0]
+        assert event["response_size"] == len(b"Hello, World!")
+
+    def test_list_body_sized_without_wrapper(self, stub_ingest):
+        _make, ingest, _ = stub_ingest
+        client = _make()
+        body = [b"Hello, ", b"World!"]
+
+        def list_app(environ: dict, start_response: Any) -> list[bytes]:
+            start_response("200 OK", [("Content-Type", "text/plain")])
+            return body
+
+        response = PeekApiWSGI(list_app, client=client)(make_environ(), lambda *a: None)
+        assert list(response) == body
+        response.close()
+        client.flush()
+
+        assert ingest.payloads[0]["events"][0]["response_size"] == len(b"Hello, World!")
+
+    def test_exc_info_restart_drops_stale_content_length(self, stub_ingest):
+        _make, ingest, _ = stub_ingest
+        client = _make()
+
+        def restarting_app(environ: dict, start_response: Any) -> list[bytes]:
+            start_response("200 OK", [("Content-Length", "100000")])
+            try:
+                raise RuntimeError("render failed")
+            except RuntimeError:
+                start_response("500 Internal Server Error", [], sys.exc_info())
+            return [b"oops"]
+
+        response = PeekApiWSGI(restarting_app, client=client)(make_environ(), lambda *a: None)
+        assert list(response) == [b"oops"]
+        response.close()
+        client.flush()
+
+        event = ingest.payloads[0]["events"][0]
+        assert (event["status_code"], event["response_size"]) == (500, 4)
+
     def test_captures_consumer_from_headers(self, make_client):
         _make, server, _ = make_client
         client = _make()
@@ -102,6 +226,18 @@ class TestWsgiMiddleware:
         event = server.payloads[0]["events"][0]
         assert event["consumer_id"] == "wsgi-client-key"
 
+    def test_authorization_header_hashed(self, make_client):
+        _make, server, _ = make_client
+        client = _make()
+        app = PeekApiWSGI(simple_wsgi_app, client=client)
+
+        environ = make_environ(headers={"authorization": "Bearer tok"})
+        consume_response(app, environ)
+        client.flush()
+
+        event = server.payloads[0]["events"][0]
+        assert event["consumer_id"] == hash_consumer_id("Bearer tok")
+
     def test_custom_identify_consumer(self, make_client):
         _make, server, _ = make_client
         client = _make(identify_consumer=lambda headers: headers.get("x-tenant-id"))
@@ -114,12 +250,52 @@ class TestWsgiMiddleware:
         event = server.payloads[0]["events"][0]
         assert event["consumer_id"] == "tenant-42"
 
+    def test_custom_identify_consumer_gets_plain_dict(self, make_client):
+        _make, server, _ = make_client
+
+        def identify(headers: dict[str, str]) -> str:
+            assert type(headers) is dict
+            return (headers.copy() | {"x-tenant-id": "fallback"})["x-tenant-id"]
+
+        client = _make(identify_consumer=identify)
+        consume_response(PeekApiWSGI(simple_wsgi_app, client=client), make_environ())
+        client.flush()
+
+        assert server.payloads[0]["events"][0]["consumer_id"] == "fallback"
+
+    def test_each_request_gets_its_own_event(self, make_client):
+        _make, _, _ = make_client
+        client = _make()
+        seen = []
+        client.track = seen.append  # A wrapper that keeps the events it is given
+        app = PeekApiWSGI(simple_wsgi_app, client=client)
+
+        consume_response(app, make_environ(path="/first"))
+        consume_response(app, make_environ(path="/second"))
+
+        assert [e.path for e in seen] == ["/first", "/second"]
+
     def test_nil_client_passthrough(self):
         app = PeekApiWSGI(simple_wsgi_app, client=None)
         status, body = consume_response(app, make_environ())
         assert status == "200 OK"
         assert body == [b"Hello, World!"]
 
+    def test_nil_client_passes_app_objects_through(self):
+        body = [b"as-is"]
+        seen = []
+
+        def app(environ: dict, start_response: Any) -> list[bytes]:
+            seen.append(start_response)
+            return body
+
+        def start_response(status: str, headers: list, exc_info: Any = None) -> None:
+            pass
+
+        # No wrapper around either the response iterable or start_response
+        assert PeekApiWSGI(app, client=None)(make_environ(), start_response) is body
+        assert seen == [start_response]
+
     def test_error_propagation(self, make_client):
         _make, _, _ = make_client
         client = _make()
@@ -151,6 +327,24 @@ class TestWsgiMiddleware:
         event = server.payloads[0]["events"][0]
         assert event["request_size"] == 128
 
+    def test_request_body_never_read(self, stub_ingest):
+        _make, ingest, _ = stub_ingest
+        client = _make()
+        app = PeekApiWSGI(simple_wsgi_app, client=client)
+
+        class UnreadableInput:
+            def read(self, *args: Any) -> bytes:
+                raise AssertionError("middleware must not read wsgi.input")
+
+            readline = readlines = read
+
+        environ = make_environ(method="POST", content_length=64)
+        environ["wsgi.input"] = UnreadableInput()
+        consume_response(app, environ)
+        client.flush()
+
+        assert ingest.payloads[0]["events"][0]["request_size"] == 64
+
     def test_collect_query_string_disabled_by_default(self, make_client):
         _make, server, _ = make_client
         client = _make()
@@ -177,6 +371,23 @@ class TestWsgiMiddleware:
         event = server.payloads[0]["events"][0]
         assert event["path"] == "/search?a=1&z=3"
 
+    def test_repeated_query_string_sorted_once(self, stub_ingest):
+        _make, ingest, _ = stub_ingest
+        client = _make(collect_query_string=True)
+        app = PeekApiWSGI(simple_wsgi_app, client=client)
+        sort_query_string.cache_clear()
+
+        for _ in range(3):
+            environ = make_environ(path="/items")
+            environ["QUERY_STRING"] = "page=2&limit=50"
+            consume_response(app, environ)
+        client.flush()
+
+        paths = [e["path"] for e in ingest.payloads[0]["events"]]
+        assert paths == ["/items?limit=50&page=2"] * 3
+        info = sort_query_string.cache_info()
+        assert (info.misses, info.hits) == (1, 2)
+
     def test_collect_query_string_no_qs(self, make_client):
         _make, server, _ = make_client
         client = _make(collect_query_string=True)
@@ -187,3 +398,28 @@ class TestWsgiMiddleware:
 
         event = server.payloads[0]["events"][0]
         assert event["path"] == "/users"
+
+
+class TestExtractHeaders:
+    def test_translates_http_keys_only(self):
+        environ = {"HTTP_X_TENANT_ID": "t1", "CONTENT_TYPE": "text/plain", "wsgi.input": None}
+        assert extract_headers(environ) == {"x-tenant-id": "t1"}
+        # Second pass is served from the key cache
+        assert extract_headers(environ) == {"x-tenant-id": "t1"}
+
+
+class TestSortQueryString:
+    def test_raw_pairs_sorted_without_decoding(self):
+        # No parse_qsl/urlencode round trip: encoding and repeated keys survive
+        assert sort_query_string("q=a%20b&b=x+y&a=1&a=0") == "a=0&a=1&b=x+y&q=a%20b"
+
+    def test_single_pair_and_blank_values_kept(self):
+        assert sort_query_string("only") == "only"
+        assert sort_query_string("z=&a") == "a&z="
+
+
+class TestElapsedMs:
+    def test_integer_clock_truncated_to_hundredths(self):
+        ms = elapsed_ms(time.perf_counter_ns() - 12_345_678)
+        assert 12.34 <= ms < 1000
+        assert round(ms, 2) == ms